@@ -3,6 +3,7 @@
 
 import asyncio
 import os
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Any
 
@@ -14,12 +15,28 @@ from mcp.types import Tool, TextContent, Prompt, PromptMessage, TextContent as P
 try:
     from .tools.analyzer import analyser_offre
     from .tools.notion_client import creer_candidature_notion
+    from .tools.offer_archive import ArchiveOffres
     from .tools.profile_extractor import extract_minimal_profile, add_cache_metadata
+    from .tools.revisit_scheduler import charger_etat, cle_site, enregistrer_visite, lister_sites, planifier_visites
+    from .utils.execution import (
+        TIMEOUT_DEFAUT,
+        executer_en_thread,
+        executer_lot_en_processus,
+        fermer_pools,
+    )
 except ImportError:
     # Fallback pour import direct
     from tools.analyzer import analyser_offre
     from tools.notion_client import creer_candidature_notion
+    from tools.offer_archive import ArchiveOffres
     from tools.profile_extractor import extract_minimal_profile, add_cache_metadata
+    from tools.revisit_scheduler import charger_etat, cle_site, enregistrer_visite, lister_sites, planifier_visites
+    from utils.execution import (
+        TIMEOUT_DEFAUT,
+        executer_en_thread,
+        executer_lot_en_processus,
+        fermer_pools,
+    )
 
 
 # Chemins de configuration
@@ -28,6 +45,16 @@ PROFIL_PATH = CONFIG_DIR / "profil.yaml"
 SITES_PATH = CONFIG_DIR / "sites.yaml"
 SETTINGS_PATH = CONFIG_DIR / "settings.yaml"
 
+# Données persistées par le serveur
+DATA_DIR = Path(__file__).parent.parent / "data"
+ETAT_SITES_PATH = DATA_DIR / "etat_sites.json"
+ARCHIVE_PATH = DATA_DIR / "archive_offres.jsonl"
+ARCHIVE_PROFIL_PATH = DATA_DIR / "archive_profil.json"
+
+# Archive des offres analysées, chargée au premier usage
+_archive: ArchiveOffres | None = None
+_verrou_archive = asyncio.Lock()
+
 
 def load_config(path: Path) -> dict[str, Any]:
     """Charge un fichier de configuration YAML."""
@@ -35,6 +62,20 @@ def load_config(path: Path) -> dict[str, Any]:
         return yaml.safe_load(f)
 
 
+def get_timeout(settings: dict, cle: str = "timeout_outil") -> float:
+    """Retourne un timeout (en secondes) de la section 'serveur' des paramètres."""
+    return settings.get("serveur", {}).get(cle, TIMEOUT_DEFAUT)
+
+
+async def get_archive() -> ArchiveOffres:
+    """Retourne l'archive des offres, en la chargeant depuis le disque au premier appel."""
+    global _archive
+    async with _verrou_archive:
+        if _archive is None:
+            _archive = await executer_en_thread(ArchiveOffres, ARCHIVE_PATH, ARCHIVE_PROFIL_PATH)
+    return _archive
+
+
 # Initialiser le serveur MCP
 app = Server("veille-theses")
 
@@ -68,11 +109,12 @@ Vous allez effectuer une recherche automatique d'offres de thèse. Ce processus
 WORKFLOW À SUIVRE:
 
 1. Charger le profil candidat (outil: lire_profil) - UNE SEULE FOIS
-2. Charger la liste des sites à surveiller (outil: lire_sites_surveilles)
-3. Pour chaque site, effectuer des recherches web pour trouver des offres de thèse
+2. Charger la liste des sites à visiter aujourd'hui (outil: lire_sites_surveilles)
+3. Pour chaque site, effectuer des recherches web pour trouver des offres de thèse,
+   puis enregistrer la visite avec les offres trouvées (outil: enregistrer_visite_site)
 4. Pour chaque offre trouvée:
    - Vérifier la date limite de candidature (REJETER si passée)
-   - Si valide: analyser avec l'outil analyser_offre
+   - Si valide: analyser avec l'outil analyser_offre (ou analyser_offres pour un lot)
    - Si score ≥ 60: créer l'entrée Notion avec creer_candidature_notion
 
 RÈGLES STRICTES:
@@ -118,12 +160,46 @@ sans avoir à rappeler cet outil. Passez-le directement à 'analyser_offre' quan
             name="lire_sites_surveilles",
             description="""Lit la liste des sites à surveiller pour les offres de thèse. Claude devra ensuite faire des recherches web pour trouver les offres pertinentes.
 
+PLANIFICATION: Seuls les sites dont le contenu a probablement changé depuis la dernière visite
+sont retournés dans 'a_visiter' (par priorité, dans la limite du budget de visites).
+Les sites de 'reportes' n'ont pas besoin d'être visités lors de cette recherche.
+Après chaque visite, appelez 'enregistrer_visite_site' pour que la planification s'adapte.
+
 IMPORTANT - VALIDATION DES DATES DE CANDIDATURE:
 Lors de la recherche web, vous DEVEZ vérifier la date limite de candidature pour chaque offre trouvée.
 - Si une date limite de candidature est mentionnée ET qu'elle est passée: NE PAS analyser cette offre, NE PAS la proposer.
 - Si aucune date limite de candidature n'est mentionnée: considérer l'offre comme valide et continuer l'analyse normalement.
 La date du jour est automatiquement disponible dans votre contexte pour faire cette vérification.""",
-            inputSchema={"type": "object", "properties": {}, "required": []},
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tous": {
+                        "type": "boolean",
+                        "description": "Retourner tous les sites sans tenir compte de la planification (défaut: false)",
+                    }
+                },
+                "required": [],
+            },
+        ),
+        Tool(
+            name="enregistrer_visite_site",
+            description="Enregistre la visite d'un site surveillé et les offres qui y ont été trouvées, "
+            "pour estimer la fréquence de changement du site",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "L'URL du site telle que retournée par lire_sites_surveilles",
+                    },
+                    "offres": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Les URLs (ou à défaut les titres) des offres trouvées sur le site",
+                    },
+                },
+                "required": ["url", "offres"],
+            },
         ),
         Tool(
             name="analyser_offre",
@@ -140,6 +216,36 @@ La date du jour est automatiquement disponible dans votre contexte pour faire ce
                 "required": ["offre"],
             },
         ),
+        Tool(
+            name="analyser_offres",
+            description="""Analyse un lot d'offres de thèse en parallèle et retourne un score pour chacune.
+
+À privilégier par rapport à plusieurs appels successifs à 'analyser_offre' quand plusieurs offres
+ont été trouvées : le scoring est réparti sur plusieurs processus.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "offres": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "Liste des offres à analyser (titre, description, lieu, etc.)",
+                    },
+                    "profil": {
+                        "type": "object",
+                        "description": "Le profil du candidat (optionnel, sera chargé si absent)",
+                    },
+                },
+                "required": ["offres"],
+            },
+        ),
+        Tool(
+            name="reevaluer_archive",
+            description="""Re-note les offres déjà analysées après une modification du profil (profil.yaml).
+
+Seules les offres contenant un terme ajouté, retiré ou déplacé dans le profil sont ré-analysées.
+Retourne les offres dont le score a franchi un seuil (suggestion ou haute priorité).""",
+            inputSchema={"type": "object", "properties": {}, "required": []},
+        ),
         Tool(
             name="creer_candidature_notion",
             description="Crée une entrée dans la base Notion 'Suivi de Candidatures' pour une offre de thèse",
@@ -157,31 +263,101 @@ La date du jour est automatiquement disponible dans votre contexte pour faire ce
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-    """Appelle un outil selon son nom."""
+    """Appelle un outil selon son nom.
+
+    Le travail bloquant (lecture des fichiers, scoring, appels Notion) est délégué
+    aux pools de `utils.execution` pour que plusieurs appels puissent avancer en parallèle.
+    """
+    try:
+        return await _dispatcher_outil(name, arguments)
+    except asyncio.TimeoutError:
+        return [TextContent(type="text", text=f"❌ Erreur: délai dépassé pour l'outil {name}")]
+    except BrokenProcessPool:
+        return [
+            TextContent(type="text", text=f"❌ Erreur: un processus d'analyse s'est arrêté pendant l'outil {name}")
+        ]
+
+
+async def _dispatcher_outil(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+    """Exécute un outil hors de la boucle d'événements."""
 
     if name == "lire_profil":
-        profil_complet = load_config(PROFIL_PATH)
+        profil_complet = await executer_en_thread(load_config, PROFIL_PATH)
         profil_minimal = extract_minimal_profile(profil_complet)
         message_avec_metadata = add_cache_metadata(profil_minimal)
         return [TextContent(type="text", text=message_avec_metadata)]
 
     elif name == "lire_sites_surveilles":
-        sites = load_config(SITES_PATH)
-        return [TextContent(type="text", text=yaml.dump(sites, allow_unicode=True, default_flow_style=False))]
+        sites = await executer_en_thread(load_config, SITES_PATH)
+        if arguments.get("tous"):
+            return [TextContent(type="text", text=yaml.dump(sites, allow_unicode=True, default_flow_style=False))]
+
+        settings = await executer_en_thread(load_config, SETTINGS_PATH)
+        etat = await executer_en_thread(charger_etat, ETAT_SITES_PATH)
+        plan = planifier_visites(sites, etat, settings)
+        return [TextContent(type="text", text=yaml.dump(plan, allow_unicode=True, default_flow_style=False))]
+
+    elif name == "enregistrer_visite_site":
+        sites = await executer_en_thread(load_config, SITES_PATH)
+        if arguments["url"] not in {cle_site(site) for site in lister_sites(sites)}:
+            return [
+                TextContent(
+                    type="text",
+                    text=f"❌ Erreur: site inconnu ({arguments['url']}). "
+                    "Utilisez l'URL exacte retournée par lire_sites_surveilles",
+                )
+            ]
+
+        visite = await executer_en_thread(enregistrer_visite, ETAT_SITES_PATH, arguments["url"], arguments["offres"])
+        statut = "contenu modifié" if visite["a_change"] else "contenu inchangé"
+        return [TextContent(type="text", text=f"✅ Visite enregistrée ({statut}): {arguments['url']}")]
 
     elif name == "analyser_offre":
         offre = arguments["offre"]
-        profil = arguments.get("profil") or load_config(PROFIL_PATH)
-        settings = load_config(SETTINGS_PATH)
+        settings = await executer_en_thread(load_config, SETTINGS_PATH)
+        profil = arguments.get("profil") or await executer_en_thread(load_config, PROFIL_PATH)
 
-        analyse = analyser_offre(offre, profil, settings)
+        # Une seule offre : le coût d'un aller-retour vers un processus dépasse celui du scoring
+        analyse = await executer_en_thread(analyser_offre, offre, profil, settings, timeout=get_timeout(settings))
+
+        archive = await get_archive()
+        await executer_en_thread(archive.ajouter, offre, profil, analyse, settings)
 
         return [TextContent(type="text", text=yaml.dump(analyse, allow_unicode=True, default_flow_style=False))]
 
+    elif name == "analyser_offres":
+        offres = arguments["offres"]
+        settings = await executer_en_thread(load_config, SETTINGS_PATH)
+        profil = arguments.get("profil") or await executer_en_thread(load_config, PROFIL_PATH)
+
+        analyses = await executer_lot_en_processus(
+            analyser_offre,
+            [(offre, profil, settings) for offre in offres],
+            timeout=get_timeout(settings, "timeout_lot"),
+        )
+        resultats = [{"titre": offre.get("titre", ""), **analyse} for offre, analyse in zip(offres, analyses)]
+
+        archive = await get_archive()
+        for offre, analyse in zip(offres, analyses):
+            await executer_en_thread(archive.ajouter, offre, profil, analyse, settings)
+
+        return [TextContent(type="text", text=yaml.dump(resultats, allow_unicode=True, default_flow_style=False))]
+
+    elif name == "reevaluer_archive":
+        settings = await executer_en_thread(load_config, SETTINGS_PATH)
+        profil = await executer_en_thread(load_config, PROFIL_PATH)
+
+        archive = await get_archive()
+        # Pas de timeout : le thread ne peut pas être interrompu, et abandonner son
+        # rapport perdrait les franchissements de seuil (la différence serait déjà appliquée)
+        rapport = await executer_en_thread(archive.reevaluer, profil, settings, timeout=None)
+
+        return [TextContent(type="text", text=yaml.dump(rapport, allow_unicode=True, default_flow_style=False))]
+
     elif name == "creer_candidature_notion":
         offre = arguments["offre"]
         analyse = arguments["analyse"]
-        settings = load_config(SETTINGS_PATH)
+        settings = await executer_en_thread(load_config, SETTINGS_PATH)
 
         notion_api_key = os.getenv("NOTION_API_KEY")
         if not notion_api_key:
@@ -191,7 +367,9 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
                 )
             ]
 
-        result = await creer_candidature_notion(offre, analyse, settings, notion_api_key)
+        result = await executer_en_thread(
+            creer_candidature_notion, offre, analyse, settings, notion_api_key, timeout=get_timeout(settings)
+        )
 
         if result["success"]:
             return [
@@ -210,8 +388,11 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
 
 async def main():
     """Point d'entrée principal du serveur MCP."""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        fermer_pools()
 
 
 if __name__ == "__main__":
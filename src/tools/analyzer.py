@@ -2,6 +2,62 @@
 
 from typing import Any
 
+# Catégories de termes du profil comparées au lieu de l'offre (les autres le sont au texte)
+CATEGORIES_LIEU = ("localisation_preferences", "localisation_acceptables")
+
+
+def texte_offre(offre: dict) -> str:
+    """Retourne le texte de l'offre dans lequel les termes du profil sont recherchés."""
+    return " ".join([
+        offre.get("titre", ""),
+        offre.get("description", ""),
+        offre.get("labo", "")
+    ]).lower()
+
+
+def extraire_termes(profil: dict) -> dict[str, list[str]]:
+    """
+    Extrait les termes du profil utilisés par le matching, par catégorie.
+
+    Accepte un profil minimal (voir profile_extractor) ou un profil complet.
+
+    Args:
+        profil: Le profil du candidat
+
+    Returns:
+        Dictionnaire catégorie -> liste de termes (casse d'origine)
+    """
+    # Support pour profil minimal (localisation directement dans profil)
+    # ou profil complet (localisation dans criteres_these)
+    if "localisation" in profil:
+        localisation = profil["localisation"]
+    else:
+        criteres_these = profil.get("criteres_these", {})
+        localisation = criteres_these.get("localisation", {})
+
+    # Support pour profil minimal (competences en liste aplatie)
+    # ou profil complet (competences_techniques en dict)
+    if "competences" in profil and isinstance(profil["competences"], list):
+        toutes_competences = list(profil["competences"])
+    else:
+        competences = profil.get("competences_techniques", {})
+        toutes_competences = []
+        for categorie, items in competences.items():
+            if isinstance(items, list):
+                toutes_competences.extend(items)
+
+    domaines = profil.get("domaines_interet", {})
+
+    return {
+        "mots_cles_positifs": profil.get("mots_cles_positifs", []),
+        "mots_cles_negatifs": profil.get("mots_cles_negatifs", []),
+        "localisation_preferences": localisation.get("preferences", []),
+        "localisation_acceptables": localisation.get("acceptables", []),
+        "competences": toutes_competences,
+        "domaines_principaux": domaines.get("principaux", []),
+        "domaines_secondaires": domaines.get("secondaires", []),
+    }
+
 
 def analyser_offre(offre: dict, profil: dict, settings: dict) -> dict[str, Any]:
     """
@@ -24,15 +80,12 @@ def analyser_offre(offre: dict, profil: dict, settings: dict) -> dict[str, Any]:
     points_faibles = []
 
     # Texte complet à analyser
-    texte_offre = " ".join([
-        offre.get("titre", ""),
-        offre.get("description", ""),
-        offre.get("labo", "")
-    ]).lower()
+    texte = texte_offre(offre)
+    termes = extraire_termes(profil)
 
     # 1. Analyse des mots-clés positifs
-    mots_cles_positifs = profil.get("mots_cles_positifs", [])
-    mots_trouves = [mot for mot in mots_cles_positifs if mot.lower() in texte_offre]
+    mots_cles_positifs = termes["mots_cles_positifs"]
+    mots_trouves = [mot for mot in mots_cles_positifs if mot.lower() in texte]
 
     if mots_trouves:
         bonus = min(len(mots_trouves) * 5, 40)  # Max 40 points
@@ -40,8 +93,8 @@ def analyser_offre(offre: dict, profil: dict, settings: dict) -> dict[str, Any]:
         points_forts.append(f"Mots-clés pertinents trouvés: {', '.join(mots_trouves[:5])}")
 
     # 2. Analyse des mots-clés négatifs
-    mots_cles_negatifs = profil.get("mots_cles_negatifs", [])
-    mots_negatifs_trouves = [mot for mot in mots_cles_negatifs if mot.lower() in texte_offre]
+    mots_cles_negatifs = termes["mots_cles_negatifs"]
+    mots_negatifs_trouves = [mot for mot in mots_cles_negatifs if mot.lower() in texte]
 
     if mots_negatifs_trouves:
         malus = min(len(mots_negatifs_trouves) * 10, 30)
@@ -51,16 +104,8 @@ def analyser_offre(offre: dict, profil: dict, settings: dict) -> dict[str, Any]:
     # 3. Analyse de la localisation
     lieu = offre.get("lieu", "").lower()
 
-    # Support pour profil minimal (localisation directement dans profil)
-    # ou profil complet (localisation dans criteres_these)
-    if "localisation" in profil:
-        localisation = profil["localisation"]
-    else:
-        criteres_these = profil.get("criteres_these", {})
-        localisation = criteres_these.get("localisation", {})
-
-    preferences = [v.lower() for v in localisation.get("preferences", [])]
-    acceptables = [v.lower() for v in localisation.get("acceptables", [])]
+    preferences = [v.lower() for v in termes["localisation_preferences"]]
+    acceptables = [v.lower() for v in termes["localisation_acceptables"]]
 
     if any(pref in lieu for pref in preferences):
         score += 20
@@ -73,18 +118,9 @@ def analyser_offre(offre: dict, profil: dict, settings: dict) -> dict[str, Any]:
         points_faibles.append(f"Localisation non prioritaire: {offre.get('lieu', 'Non spécifié')}")
 
     # 4. Bonus pour les compétences techniques
-    # Support pour profil minimal (competences en liste aplatie)
-    # ou profil complet (competences_techniques en dict)
-    if "competences" in profil and isinstance(profil["competences"], list):
-        toutes_competences = [c.lower() for c in profil["competences"]]
-    else:
-        competences = profil.get("competences_techniques", {})
-        toutes_competences = []
-        for categorie, items in competences.items():
-            if isinstance(items, list):
-                toutes_competences.extend([c.lower() for c in items])
+    toutes_competences = [c.lower() for c in termes["competences"]]
 
-    competences_trouvees = [comp for comp in toutes_competences if comp in texte_offre]
+    competences_trouvees = [comp for comp in toutes_competences if comp in texte]
 
     if competences_trouvees:
         bonus = min(len(competences_trouvees) * 3, 20)
@@ -92,12 +128,11 @@ def analyser_offre(offre: dict, profil: dict, settings: dict) -> dict[str, Any]:
         points_forts.append(f"Compétences requises correspondantes: {', '.join(competences_trouvees[:3])}")
 
     # 5. Bonus pour les domaines d'intérêt
-    domaines = profil.get("domaines_interet", {})
-    principaux = [d.lower() for d in domaines.get("principaux", [])]
-    secondaires = [d.lower() for d in domaines.get("secondaires", [])]
+    principaux = [d.lower() for d in termes["domaines_principaux"]]
+    secondaires = [d.lower() for d in termes["domaines_secondaires"]]
 
-    domaines_trouves_principaux = [d for d in principaux if d in texte_offre]
-    domaines_trouves_secondaires = [d for d in secondaires if d in texte_offre]
+    domaines_trouves_principaux = [d for d in principaux if d in texte]
+    domaines_trouves_secondaires = [d for d in secondaires if d in texte]
 
     if domaines_trouves_principaux:
         score += 15
@@ -5,10 +5,12 @@ from typing import Any
 from notion_client import Client
 
 
-async def creer_candidature_notion(offre: dict, analyse: dict, settings: dict, notion_api_key: str) -> dict[str, Any]:
+def creer_candidature_notion(offre: dict, analyse: dict, settings: dict, notion_api_key: str) -> dict[str, Any]:
     """
     Crée une entrée dans la base Notion pour une offre de thèse.
 
+    Fonction bloquante (appel HTTP) : le serveur MCP l'exécute dans son pool de threads.
+
     Args:
         offre: L'offre de thèse (titre, labo, url, lieu, etc.)
         analyse: Résultat de l'analyse (score, justification, etc.)
@@ -22,7 +24,9 @@ async def creer_candidature_notion(offre: dict, analyse: dict, settings: dict, n
         - error: str (si échec)
     """
     try:
-        notion = Client(auth=notion_api_key)
+        # Borner la durée de l'appel HTTP pour qu'un timeout côté serveur libère le thread
+        timeout_s = settings.get("notion", {}).get("timeout", 30)
+        notion = Client(auth=notion_api_key, timeout_ms=int(timeout_s * 1000))
         database_id = settings["notion"]["database_id"]
 
         # Préparer le contenu de la note
@@ -0,0 +1,317 @@
+"""Archive des offres analysées, avec index inversés pour le re-scoring incrémental."""
+
+import hashlib
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+try:
+    from .analyzer import CATEGORIES_LIEU, analyser_offre, extraire_termes, texte_offre
+except ImportError:
+    # Fallback pour import direct
+    from tools.analyzer import CATEGORIES_LIEU, analyser_offre, extraire_termes, texte_offre
+
+# Taille des n-grammes de caractères de l'index des textes
+TAILLE_NGRAMME = 3
+
+
+def identifiant_offre(offre: dict) -> str:
+    """Retourne l'identifiant d'une offre dans l'archive (URL, ou empreinte du texte à défaut)."""
+    if offre.get("url"):
+        return offre["url"]
+    return hashlib.sha256(texte_offre(offre).encode("utf-8")).hexdigest()[:16]
+
+
+def termes_profil(profil: dict) -> Counter:
+    """
+    Retourne les couples (catégorie, terme en minuscules) d'un profil.
+
+    Multi-ensemble : analyser_offre compte un terme en double deux fois,
+    retirer un doublon doit donc apparaître dans la différence entre profils.
+    """
+    return Counter(
+        (categorie, terme.lower())
+        for categorie, termes in extraire_termes(profil).items()
+        for terme in termes
+    )
+
+
+def profil_reference(profil: dict) -> dict[str, Any]:
+    """Réduit un profil (minimal ou complet) aux seuls termes utilisés par analyser_offre."""
+    termes = extraire_termes(profil)
+    return {
+        "mots_cles_positifs": list(termes["mots_cles_positifs"]),
+        "mots_cles_negatifs": list(termes["mots_cles_negatifs"]),
+        "domaines_interet": {
+            "principaux": list(termes["domaines_principaux"]),
+            "secondaires": list(termes["domaines_secondaires"]),
+        },
+        "localisation": {
+            "preferences": list(termes["localisation_preferences"]),
+            "acceptables": list(termes["localisation_acceptables"]),
+        },
+        "competences": list(termes["competences"]),
+    }
+
+
+def champ_categorie(categorie: str) -> str:
+    """Retourne le champ de l'offre ('lieu' ou 'texte') où sont cherchés les termes d'une catégorie."""
+    return "lieu" if categorie in CATEGORIES_LIEU else "texte"
+
+
+def _ngrammes(texte: str) -> set[str]:
+    """Découpe un texte en n-grammes de caractères."""
+    return {texte[i:i + TAILLE_NGRAMME] for i in range(len(texte) - TAILLE_NGRAMME + 1)}
+
+
+def _champs(offre: dict) -> dict[str, str]:
+    """Retourne les champs de l'offre dans lesquels les termes du profil sont recherchés."""
+    return {"texte": texte_offre(offre), "lieu": offre.get("lieu", "").lower()}
+
+
+class ArchiveOffres:
+    """
+    Archive des offres analysées, persistée dans un journal JSONL (un enregistrement par ligne).
+
+    Toutes les offres sont notées et indexées avec un même profil de référence
+    (celui de la dernière réévaluation). Deux index inversés permettent alors de
+    retrouver les offres concernées par un terme sans parcourir toute l'archive :
+    - index_termes: (champ, terme) -> offres contenant ce terme du profil de référence
+      (complet : une offre absente de l'index ne contient pas le terme)
+    - index_ngrammes: champ -> n-gramme -> offres, pour les termes absents du profil de référence
+    """
+
+    def __init__(self, path: Path, profil_path: Path):
+        self.path = path
+        self.profil_path = profil_path
+        self.offres: dict[str, dict[str, Any]] = {}
+        self.index_termes: dict[tuple[str, str], set[str]] = {}
+        self.index_ngrammes: dict[str, dict[str, set[str]]] = {"texte": {}, "lieu": {}}
+        self.profil: dict[str, Any] | None = None
+        self.termes_profil: Counter | None = None
+        self._verrou = threading.Lock()
+        self._charger()
+
+    def _charger(self) -> None:
+        """Charge le journal et reconstruit les index en mémoire."""
+        if self.profil_path.exists():
+            with open(self.profil_path, "r", encoding="utf-8") as f:
+                self.profil = json.load(f)
+            self.termes_profil = termes_profil(self.profil)
+
+        nb_lignes = 0
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for ligne in f:
+                    if ligne.strip():
+                        nb_lignes += 1
+                        self._indexer(json.loads(ligne))
+
+        # Le journal contient une ligne par mise à jour : le réécrire s'il a trop grossi
+        if nb_lignes > 2 * len(self.offres):
+            self._compacter()
+
+    def _indexer(self, enregistrement: dict[str, Any]) -> None:
+        """Ajoute ou remplace un enregistrement dans l'archive et ses index."""
+        identifiant = enregistrement["id"]
+        ancien = self.offres.get(identifiant)
+
+        if ancien is not None:
+            for champ, termes in ancien["termes"].items():
+                for terme in termes:
+                    offres = self.index_termes.get((champ, terme))
+                    if offres is not None:
+                        offres.discard(identifiant)
+                        if not offres:
+                            del self.index_termes[(champ, terme)]
+
+        anciens_champs = _champs(ancien["offre"]) if ancien is not None else {}
+        for champ, valeur in _champs(enregistrement["offre"]).items():
+            if anciens_champs.get(champ) == valeur:
+                continue
+            for ngramme in _ngrammes(anciens_champs.get(champ, "")):
+                self.index_ngrammes[champ][ngramme].discard(identifiant)
+            for ngramme in _ngrammes(valeur):
+                self.index_ngrammes[champ].setdefault(ngramme, set()).add(identifiant)
+
+        for champ, termes in enregistrement["termes"].items():
+            for terme in termes:
+                self.index_termes.setdefault((champ, terme), set()).add(identifiant)
+
+        self.offres[identifiant] = enregistrement
+
+    def _enregistrer(self, enregistrement: dict[str, Any]) -> None:
+        """Indexe un enregistrement et l'ajoute au journal."""
+        self._indexer(enregistrement)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
+
+    def _compacter(self) -> None:
+        """Réécrit le journal avec un seul enregistrement par offre."""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for enregistrement in self.offres.values():
+                f.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
+        tmp_path.replace(self.path)
+
+    def _sauvegarder_profil(self, profil: dict) -> None:
+        """Mémorise le profil de référence avec lequel les offres archivées sont notées."""
+        self.profil = profil_reference(profil)
+        self.termes_profil = termes_profil(self.profil)
+        self.profil_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.profil_path, "w", encoding="utf-8") as f:
+            json.dump(self.profil, f, ensure_ascii=False, indent=2)
+
+    def _construire_enregistrement(
+        self, offre: dict, analyse: dict, termes_reference: Counter | None = None
+    ) -> dict[str, Any]:
+        """Construit l'enregistrement d'une offre avec les termes du profil qu'elle contient.
+
+        Les termes sont ceux du profil de référence, sauf pendant une réévaluation.
+        """
+        if termes_reference is None:
+            termes_reference = self.termes_profil
+
+        champs = _champs(offre)
+        termes: dict[str, set[str]] = {"texte": set(), "lieu": set()}
+        for categorie, terme in termes_reference:
+            champ = champ_categorie(categorie)
+            if terme in champs[champ]:
+                termes[champ].add(terme)
+
+        return {
+            "id": identifiant_offre(offre),
+            "offre": offre,
+            "score": analyse["score"],
+            "termes": {champ: sorted(valeurs) for champ, valeurs in termes.items()},
+        }
+
+    def ajouter(self, offre: dict, profil: dict, analyse: dict, settings: dict) -> str:
+        """
+        Archive une offre analysée.
+
+        Si l'offre a été analysée avec un profil différent du profil de référence
+        (profil.yaml modifié mais pas encore réévalué, ou profil caché périmé),
+        elle est re-notée avec le profil de référence : la différence sera prise
+        en compte par la prochaine réévaluation, comme pour les autres offres.
+
+        Args:
+            offre: L'offre analysée
+            profil: Le profil utilisé pour l'analyse
+            analyse: Le résultat de analyser_offre
+            settings: Les paramètres de configuration
+
+        Returns:
+            L'identifiant de l'offre dans l'archive
+        """
+        with self._verrou:
+            if self.profil is None:
+                self._sauvegarder_profil(profil)
+            elif termes_profil(profil) != self.termes_profil:
+                analyse = analyser_offre(offre, self.profil, settings)
+
+            enregistrement = self._construire_enregistrement(offre, analyse)
+            self._enregistrer(enregistrement)
+            return enregistrement["id"]
+
+    def candidats(self, champ: str, terme: str) -> set[str]:
+        """
+        Retourne les offres dont le champ contient le terme.
+
+        Utilise l'index des termes si le terme appartient au profil de référence,
+        sinon l'index des n-grammes (vérifié ensuite par une recherche exacte).
+        """
+        if any(champ_categorie(c) == champ and t == terme for c, t in self.termes_profil):
+            return set(self.index_termes.get((champ, terme), set()))
+
+        index = self.index_ngrammes[champ]
+        if len(terme) < TAILLE_NGRAMME:
+            # Terme plus court qu'un n-gramme : parcourir le vocabulaire de l'index
+            ids = set()
+            for ngramme, offres in index.items():
+                if terme in ngramme:
+                    ids |= offres
+        else:
+            ngrammes = sorted(_ngrammes(terme), key=lambda n: len(index.get(n, ())))
+            ids = set(index.get(ngrammes[0], set()))
+            for ngramme in ngrammes[1:]:
+                if not ids:
+                    break
+                ids &= index.get(ngramme, set())
+
+        return {i for i in ids if terme in _champs(self.offres[i]["offre"])[champ]}
+
+    def reevaluer(self, nouveau_profil: dict, settings: dict) -> dict[str, Any]:
+        """
+        Re-note les offres concernées par un changement de profil.
+
+        Seules les offres contenant un terme ajouté, retiré ou changé de catégorie
+        sont ré-analysées : le coût est proportionnel à la différence entre les profils,
+        pas à la taille de l'archive.
+
+        Args:
+            nouveau_profil: Le profil modifié
+            settings: Les paramètres de configuration
+
+        Returns:
+            Dictionnaire contenant:
+            - termes_modifies: list[str]
+            - nb_offres_reevaluees: int
+            - franchissements: list[dict] (offres dont le score a franchi un seuil)
+        """
+        with self._verrou:
+            if self.profil is None:
+                self._sauvegarder_profil(nouveau_profil)
+                return {"termes_modifies": [], "nb_offres_reevaluees": 0, "franchissements": []}
+
+            nouveaux_termes = termes_profil(nouveau_profil)
+            diff = (self.termes_profil - nouveaux_termes) + (nouveaux_termes - self.termes_profil)
+            termes_modifies = {(champ_categorie(categorie), terme) for categorie, terme in diff}
+
+            ids = set()
+            for champ, terme in termes_modifies:
+                ids |= self.candidats(champ, terme)
+
+            seuils = {
+                "seuil_suggestion": settings["matching"]["seuil_suggestion"],
+                "seuil_haute_priorite": settings["matching"]["seuil_haute_priorite"],
+            }
+            franchissements = []
+            enregistrements = []
+
+            for identifiant in sorted(ids):
+                ancien = self.offres[identifiant]
+                analyse = analyser_offre(ancien["offre"], nouveau_profil, settings)
+
+                for nom_seuil, seuil in seuils.items():
+                    if (ancien["score"] >= seuil) != (analyse["score"] >= seuil):
+                        franchissements.append(
+                            {
+                                "id": identifiant,
+                                "titre": ancien["offre"].get("titre", ""),
+                                "url": ancien["offre"].get("url", ""),
+                                "ancien_score": ancien["score"],
+                                "nouveau_score": analyse["score"],
+                                "seuil": nom_seuil,
+                                "sens": "hausse" if analyse["score"] > ancien["score"] else "baisse",
+                            }
+                        )
+
+                # Réenregistrer même à score égal : les termes trouvés ont changé
+                enregistrements.append(self._construire_enregistrement(ancien["offre"], analyse, nouveaux_termes))
+
+            # Journaliser une fois tout re-noté, et changer de profil de référence en dernier :
+            # si la réévaluation est interrompue, la prochaine retrouve la même différence
+            # et reprend les offres non re-notées
+            for enregistrement in enregistrements:
+                self._enregistrer(enregistrement)
+            self._sauvegarder_profil(nouveau_profil)
+
+            return {
+                "termes_modifies": sorted(terme for _, terme in termes_modifies),
+                "nb_offres_reevaluees": len(ids),
+                "franchissements": franchissements,
+            }
@@ -0,0 +1,219 @@
+"""Planificateur adaptatif des visites de sites selon leur fréquence de changement."""
+
+import hashlib
+import json
+import math
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+# Fréquence a priori (en jours entre deux changements) déduite de 'frequence_maj'
+FREQUENCES_JOURS = {
+    "quotidienne": 1,
+    "hebdomadaire": 7,
+    "mensuelle": 30,
+    "trimestrielle": 90,
+    "semestrielle": 180,
+    "annuelle": 365,
+}
+
+# Fréquence a priori pour un site sans 'frequence_maj' (pages de laboratoire, etc.)
+FREQUENCE_DEFAUT_JOURS = 30
+
+# Poids de l'a priori, en nombre de comparaisons fictives
+POIDS_A_PRIORI = 2
+
+# Les visites peuvent être enregistrées en parallèle depuis le pool de threads du serveur
+_verrou_etat = threading.Lock()
+
+
+def cle_site(site: dict) -> str:
+    """Retourne l'identifiant d'un site dans l'état du planificateur (URL, ou nom à défaut)."""
+    return site.get("url") or site.get("nom", "")
+
+
+def lister_sites(sites_config: dict) -> list[dict]:
+    """
+    Aplatit sites.yaml en une liste de sites.
+
+    Args:
+        sites_config: Le contenu de sites.yaml (catégorie -> liste de sites)
+
+    Returns:
+        Liste des sites, chacun complété par sa catégorie
+    """
+    sites = []
+    for categorie, entrees in (sites_config or {}).items():
+        if not isinstance(entrees, list):
+            continue
+        for site in entrees:
+            if isinstance(site, dict):
+                sites.append({**site, "categorie": categorie})
+    return sites
+
+
+def charger_etat(path: Path) -> dict[str, Any]:
+    """Charge l'état des visites (vide si le fichier n'existe pas encore)."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def sauvegarder_etat(path: Path, etat: dict[str, Any]) -> None:
+    """Écrit l'état des visites de manière atomique."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(etat, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+
+def calculer_empreinte(offres: list) -> str:
+    """Calcule une empreinte du contenu d'un site à partir des offres qui y ont été trouvées."""
+    elements = sorted(json.dumps(offre, ensure_ascii=False, sort_keys=True) for offre in offres)
+    return hashlib.sha256("\n".join(elements).encode("utf-8")).hexdigest()
+
+
+def estimer_taux_changement(site: dict, entree: dict | None) -> float:
+    """
+    Estime le nombre de changements par jour d'un site.
+
+    Utilise l'estimateur de Cho & Garcia-Molina, qui corrige le fait qu'une visite
+    ne détecte qu'un seul changement même si le site a changé plusieurs fois
+    depuis la précédente. Tant que peu de visites ont été observées, l'estimation
+    est tirée vers la fréquence a priori donnée par 'frequence_maj'.
+
+    Args:
+        site: Le site tel que décrit dans sites.yaml
+        entree: L'état enregistré pour ce site (None si jamais visité)
+
+    Returns:
+        Taux de changement estimé (changements par jour)
+    """
+    frequence = FREQUENCES_JOURS.get(str(site.get("frequence_maj", "")).lower(), FREQUENCE_DEFAUT_JOURS)
+    taux_a_priori = 1 / frequence
+
+    if not entree or entree.get("nb_comparaisons", 0) == 0:
+        return taux_a_priori
+
+    n = entree["nb_comparaisons"]
+    x = entree["nb_changements"]
+    duree_jours = (
+        datetime.fromisoformat(entree["derniere_visite"]) - datetime.fromisoformat(entree["premiere_visite"])
+    ).total_seconds() / 86400
+    intervalle_moyen = max(duree_jours / n, 1 / 24)  # Au moins une heure
+
+    taux_observe = -math.log((n - x + 0.5) / (n + 0.5)) / intervalle_moyen
+
+    return (n * taux_observe + POIDS_A_PRIORI * taux_a_priori) / (n + POIDS_A_PRIORI)
+
+
+def planifier_visites(
+    sites_config: dict, etat: dict[str, Any], settings: dict, maintenant: datetime | None = None
+) -> dict[str, list[dict]]:
+    """
+    Décide quels sites doivent être visités lors de cette recherche.
+
+    Un site est dû si la probabilité qu'il ait changé depuis la dernière visite
+    (modèle de Poisson) dépasse le seuil configuré. Les sites dus sont classés
+    par probabilité décroissante et limités au budget de visites.
+
+    Args:
+        sites_config: Le contenu de sites.yaml
+        etat: L'état des visites (voir charger_etat)
+        settings: Les paramètres de configuration
+        maintenant: Date de référence (par défaut: maintenant)
+
+    Returns:
+        Dictionnaire contenant:
+        - a_visiter: list[dict] (sites à visiter, par priorité)
+        - reportes: list[dict] (sites non dus ou hors budget)
+    """
+    if maintenant is None:
+        maintenant = datetime.now()
+
+    planification = settings.get("planification", {})
+    budget = planification.get("budget_visites", 10)
+    seuil = planification.get("seuil_probabilite", 0.5)
+
+    candidats = []
+    for site in lister_sites(sites_config):
+        entree = etat.get(cle_site(site))
+        taux = estimer_taux_changement(site, entree)
+
+        if entree:
+            jours_ecoules = (maintenant - datetime.fromisoformat(entree["derniere_visite"])).total_seconds() / 86400
+            probabilite = 1 - math.exp(-taux * max(jours_ecoules, 0))
+        else:
+            probabilite = 1.0
+
+        candidats.append(
+            (
+                probabilite,
+                {
+                    **site,
+                    "probabilite_changement": round(probabilite, 2),
+                    "changements_par_mois": round(taux * 30, 1),
+                    "derniere_visite": entree["derniere_visite"] if entree else None,
+                },
+            )
+        )
+
+    # Trier et filtrer sur la probabilité exacte : l'arrondi ne sert qu'à l'affichage
+    candidats.sort(key=lambda c: c[0], reverse=True)
+
+    dus = [site for probabilite, site in candidats if probabilite >= seuil]
+    a_visiter = dus[:budget]
+    reportes = dus[budget:] + [site for probabilite, site in candidats if probabilite < seuil]
+
+    return {"a_visiter": a_visiter, "reportes": reportes}
+
+
+def enregistrer_visite(path: Path, url: str, offres: list, maintenant: datetime | None = None) -> dict[str, Any]:
+    """
+    Enregistre la visite d'un site et détecte si son contenu a changé.
+
+    Args:
+        path: Chemin du fichier d'état
+        url: URL du site visité (clé dans sites.yaml)
+        offres: Les offres trouvées sur le site (titres, URLs, etc.)
+        maintenant: Date de la visite (par défaut: maintenant)
+
+    Returns:
+        L'état mis à jour du site, avec 'a_change' indiquant si le contenu a changé
+    """
+    if maintenant is None:
+        maintenant = datetime.now()
+
+    horodatage = maintenant.isoformat(timespec="seconds")
+    empreinte = calculer_empreinte(offres)
+
+    with _verrou_etat:
+        etat = charger_etat(path)
+        entree = etat.get(url)
+
+        if entree is None:
+            entree = {
+                "premiere_visite": horodatage,
+                "derniere_visite": horodatage,
+                "dernier_changement": horodatage,
+                "nb_comparaisons": 0,
+                "nb_changements": 0,
+                "empreinte": empreinte,
+            }
+            a_change = True
+        else:
+            a_change = empreinte != entree["empreinte"]
+            entree["derniere_visite"] = horodatage
+            entree["nb_comparaisons"] += 1
+            if a_change:
+                entree["nb_changements"] += 1
+                entree["dernier_changement"] = horodatage
+                entree["empreinte"] = empreinte
+
+        etat[url] = entree
+        sauvegarder_etat(path, etat)
+
+    return {**entree, "a_change": a_change}
@@ -0,0 +1,109 @@
+"""Exécution du travail bloquant hors de la boucle asyncio du serveur MCP."""
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+# Taille des pools (bornées pour ne pas saturer la machine ni l'API Notion)
+MAX_THREADS = 4
+MAX_PROCESSUS = 2
+
+# Timeout par défaut (en secondes) d'un travail soumis à un pool
+TIMEOUT_DEFAUT = 60
+
+_pool_threads: ThreadPoolExecutor | None = None
+_pool_processus: ProcessPoolExecutor | None = None
+
+
+def _get_pool_threads() -> ThreadPoolExecutor:
+    """Retourne le pool de threads partagé (I/O fichiers, appels HTTP)."""
+    global _pool_threads
+    if _pool_threads is None:
+        _pool_threads = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="veille-io")
+    return _pool_threads
+
+
+def _get_pool_processus() -> ProcessPoolExecutor:
+    """Retourne le pool de processus partagé (scoring CPU en lot)."""
+    global _pool_processus
+    if _pool_processus is None:
+        # "spawn" évite de forker un processus qui possède déjà des threads
+        _pool_processus = ProcessPoolExecutor(
+            max_workers=MAX_PROCESSUS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool_processus
+
+
+def _arreter_pool_processus(pool: ProcessPoolExecutor) -> None:
+    """Arrête un pool de processus en tuant ses workers, même en cours de calcul.
+
+    Le prochain appel à `_get_pool_processus` crée un pool neuf.
+    """
+    global _pool_processus
+    if _pool_processus is pool:
+        _pool_processus = None
+
+    if hasattr(pool, "terminate_workers"):  # Python 3.14+
+        pool.terminate_workers()
+        return
+
+    # Copier avant shutdown, qui vide la table des processus
+    processus = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for p in processus:
+        if p.is_alive():
+            p.terminate()
+
+
+async def _executer(pool: Executor, func: Callable[..., Any], args: tuple, kwargs: dict, timeout: float | None) -> Any:
+    """Soumet un appel à un pool et l'attend avec un timeout.
+
+    En cas de timeout ou d'annulation de la coroutine, le travail est retiré du
+    pool s'il n'a pas encore démarré. Un travail déjà en cours ne peut pas être
+    interrompu : il doit borner lui-même sa durée (ex: timeout HTTP).
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout=timeout)
+
+
+async def executer_en_thread(
+    func: Callable[..., Any], *args: Any, timeout: float | None = TIMEOUT_DEFAUT, **kwargs: Any
+) -> Any:
+    """Exécute une fonction bloquante (I/O) dans le pool de threads."""
+    return await _executer(_get_pool_threads(), func, args, kwargs, timeout)
+
+
+async def executer_lot_en_processus(
+    func: Callable[..., Any], lots_args: list[tuple], timeout: float | None = TIMEOUT_DEFAUT
+) -> list[Any]:
+    """Exécute `func` sur chaque tuple d'arguments en parallèle dans le pool de processus.
+
+    Le timeout s'applique au lot entier : s'il expire, `asyncio.TimeoutError` est levée.
+    En cas de timeout, d'annulation ou de worker mort (`BrokenProcessPool`), les
+    workers sont tués pour ne pas bloquer les lots suivants et le pool est recréé
+    au prochain appel.
+    """
+    pool = _get_pool_processus()
+    loop = asyncio.get_running_loop()
+    futures = [loop.run_in_executor(pool, functools.partial(func, *args)) for args in lots_args]
+    try:
+        return await asyncio.wait_for(asyncio.gather(*futures), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError, BrokenProcessPool):
+        for future in futures:
+            future.cancel()
+        _arreter_pool_processus(pool)
+        raise
+
+
+def fermer_pools() -> None:
+    """Arrête les pools en annulant le travail qui n'a pas encore démarré."""
+    global _pool_threads, _pool_processus
+    if _pool_threads is not None:
+        _pool_threads.shutdown(wait=False, cancel_futures=True)
+        _pool_threads = None
+    if _pool_processus is not None:
+        _arreter_pool_processus(_pool_processus)
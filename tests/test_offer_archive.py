@@ -0,0 +1,132 @@
+"""Tests du re-scoring incrémental de l'archive des offres."""
+
+import copy
+
+import pytest
+
+from src.tools.analyzer import analyser_offre
+from src.tools.offer_archive import ArchiveOffres
+
+SETTINGS = {"matching": {"seuil_suggestion": 60, "seuil_haute_priorite": 80}}
+
+PROFIL = {
+    "mots_cles_positifs": ["vision", "deep learning"],
+    "mots_cles_negatifs": ["chimie"],
+    "domaines_interet": {"principaux": ["intelligence artificielle"], "secondaires": []},
+    "localisation": {"preferences": ["Paris"], "acceptables": ["Lyon"]},
+    "competences": ["Python"],
+}
+
+OFFRES = [
+    {
+        "titre": "Vision et robotique",
+        "description": "deep learning, Python, intelligence artificielle",
+        "lieu": "Lyon",
+        "url": "https://exemple.fr/1",
+    },
+    {"titre": "Robotique marine", "description": "Python", "lieu": "Brest", "url": "https://exemple.fr/2"},
+    {"titre": "Chimie des matériaux", "description": "synthèse", "lieu": "Paris", "url": "https://exemple.fr/3"},
+]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ArchiveOffres(tmp_path / "archive.jsonl", tmp_path / "profil.json")
+    for offre in OFFRES:
+        archive.ajouter(offre, PROFIL, analyser_offre(offre, PROFIL, SETTINGS), SETTINGS)
+    return archive
+
+
+def verifier_scores(archive, profil, offres=OFFRES):
+    """Vérifie que chaque offre archivée a le score d'une analyse complète."""
+    for offre in offres:
+        attendu = analyser_offre(offre, profil, SETTINGS)["score"]
+        assert archive.offres[offre["url"]]["score"] == attendu
+
+
+def test_reevaluer_ne_renote_que_les_offres_concernees(archive):
+    profil = copy.deepcopy(PROFIL)
+    profil["localisation"]["acceptables"].remove("Lyon")
+    profil["localisation"]["preferences"].append("Lyon")
+
+    rapport = archive.reevaluer(profil, SETTINGS)
+
+    assert rapport["nb_offres_reevaluees"] == 1
+    assert [f["id"] for f in rapport["franchissements"]] == []
+    verifier_scores(archive, profil)
+
+
+def test_offre_analysee_avec_nouveau_profil_avant_reevaluation(archive, tmp_path):
+    """Un terme ajouté déjà vu dans une nouvelle offre ne doit pas masquer les anciennes."""
+    profil = copy.deepcopy(PROFIL)
+    profil["mots_cles_positifs"].append("robotique")
+    settings = {"matching": {"seuil_suggestion": 40, "seuil_haute_priorite": 80}}
+
+    nouvelle = {"titre": "Robotique agricole", "lieu": "Nantes", "url": "https://exemple.fr/4"}
+    archive.ajouter(nouvelle, profil, analyser_offre(nouvelle, profil, settings), settings)
+
+    rapport = archive.reevaluer(profil, settings)
+
+    assert rapport["nb_offres_reevaluees"] == 3
+    assert [f["id"] for f in rapport["franchissements"]] == ["https://exemple.fr/1"]
+    verifier_scores(archive, profil, OFFRES + [nouvelle])
+
+    # Le journal rechargé doit donner les mêmes index
+    rechargee = ArchiveOffres(tmp_path / "archive.jsonl", tmp_path / "profil.json")
+    assert rechargee.index_termes == archive.index_termes
+    verifier_scores(rechargee, profil, OFFRES + [nouvelle])
+
+
+def test_profil_cache_perime_apres_reevaluation(archive):
+    profil = copy.deepcopy(PROFIL)
+    profil["mots_cles_positifs"].append("robotique")
+    archive.reevaluer(profil, SETTINGS)
+
+    # Claude réutilise le profil caché d'avant la modification
+    offre = OFFRES[1]
+    archive.ajouter(offre, PROFIL, analyser_offre(offre, PROFIL, SETTINGS), SETTINGS)
+
+    verifier_scores(archive, profil)
+    assert archive.candidats("texte", "robotique") == {"https://exemple.fr/1", "https://exemple.fr/2"}
+
+
+def test_retrait_d_un_doublon(archive):
+    profil = copy.deepcopy(PROFIL)
+    profil["mots_cles_positifs"].append("vision")
+    archive.reevaluer(profil, SETTINGS)
+    verifier_scores(archive, profil)
+
+    rapport = archive.reevaluer(PROFIL, SETTINGS)
+
+    assert rapport["termes_modifies"] == ["vision"]
+    assert rapport["nb_offres_reevaluees"] == 1
+    verifier_scores(archive, PROFIL)
+
+
+def test_reevaluation_interrompue_reprise(archive, monkeypatch, tmp_path):
+    """Une réévaluation interrompue ne doit pas marquer le nouveau profil comme appliqué."""
+    import src.tools.offer_archive as module
+
+    profil = copy.deepcopy(PROFIL)
+    profil["mots_cles_positifs"].append("robotique")
+    settings = {"matching": {"seuil_suggestion": 40, "seuil_haute_priorite": 80}}
+
+    appels = []
+
+    def analyser_puis_planter(offre, profil, settings):
+        if appels:
+            raise RuntimeError("processus interrompu")
+        appels.append(offre)
+        return analyser_offre(offre, profil, settings)
+
+    monkeypatch.setattr(module, "analyser_offre", analyser_puis_planter)
+    with pytest.raises(RuntimeError):
+        archive.reevaluer(profil, settings)
+    monkeypatch.undo()
+
+    rechargee = ArchiveOffres(tmp_path / "archive.jsonl", tmp_path / "profil.json")
+    rapport = rechargee.reevaluer(profil, settings)
+
+    assert rapport["termes_modifies"] == ["robotique"]
+    assert [f["id"] for f in rapport["franchissements"]] == ["https://exemple.fr/1"]
+    verifier_scores(rechargee, profil)
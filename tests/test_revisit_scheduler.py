@@ -0,0 +1,104 @@
+"""Tests du planificateur adaptatif des visites de sites."""
+
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.tools.revisit_scheduler import charger_etat, enregistrer_visite, planifier_visites
+
+DEBUT = datetime(2026, 1, 1)
+
+SETTINGS = {"planification": {"budget_visites": 10, "seuil_probabilite": 0.5}}
+
+
+def site(nom, frequence_maj=None):
+    entree = {"nom": nom, "url": f"https://{nom}.fr"}
+    if frequence_maj:
+        entree["frequence_maj"] = frequence_maj
+    return entree
+
+
+def etat_jamais_compare(derniere_visite):
+    """État d'un site visité une seule fois : seule la fréquence a priori compte."""
+    horodatage = derniere_visite.isoformat(timespec="seconds")
+    return {
+        "premiere_visite": horodatage,
+        "derniere_visite": horodatage,
+        "dernier_changement": horodatage,
+        "nb_comparaisons": 0,
+        "nb_changements": 0,
+        "empreinte": "",
+    }
+
+
+@pytest.fixture
+def etat_path(tmp_path):
+    return tmp_path / "etat_sites.json"
+
+
+def test_site_quotidien_du_et_site_semestriel_reporte(etat_path):
+    sites = {"portails": [site("abg", "quotidienne")], "laboratoires": [site("labo", "semestrielle")]}
+
+    for jour in range(10):
+        maintenant = DEBUT + timedelta(days=jour)
+        enregistrer_visite(etat_path, "https://abg.fr", [f"offre-{jour}"], maintenant)
+        enregistrer_visite(etat_path, "https://labo.fr", ["offre-stable"], maintenant)
+
+    plan = planifier_visites(sites, charger_etat(etat_path), SETTINGS, DEBUT + timedelta(days=10))
+
+    assert [s["nom"] for s in plan["a_visiter"]] == ["abg"]
+    assert [s["nom"] for s in plan["reportes"]] == ["labo"]
+    assert plan["a_visiter"][0]["categorie"] == "portails"
+
+
+def test_site_jamais_visite_est_du():
+    plan = planifier_visites({"laboratoires": [site("labo", "annuelle")]}, {}, SETTINGS, DEBUT)
+
+    assert plan["a_visiter"][0]["probabilite_changement"] == 1.0
+    assert plan["a_visiter"][0]["derniere_visite"] is None
+
+
+def test_budget_et_seuil_sur_probabilite_exacte():
+    # Site quotidien jamais comparé : probabilité = 1 - exp(-jours écoulés)
+    def visite_pour(probabilite):
+        return DEBUT - timedelta(days=-math.log(1 - probabilite))
+
+    sites = {"portails": [site("a", "quotidienne"), site("b", "quotidienne"), site("c", "quotidienne")]}
+    etat = {
+        "https://a.fr": etat_jamais_compare(visite_pour(0.601)),
+        "https://b.fr": etat_jamais_compare(visite_pour(0.604)),
+        "https://c.fr": etat_jamais_compare(visite_pour(0.4985)),
+    }
+    settings = {"planification": {"budget_visites": 1, "seuil_probabilite": 0.5}}
+
+    plan = planifier_visites(sites, etat, settings, DEBUT)
+
+    # a et b s'affichent tous deux à 0.6, mais b est plus probable ; c (affiché 0.5) reste sous le seuil
+    assert [s["nom"] for s in plan["a_visiter"]] == ["b"]
+    assert [s["nom"] for s in plan["reportes"]] == ["a", "c"]
+    assert [s["probabilite_changement"] for s in plan["reportes"]] == [0.6, 0.5]
+
+
+def test_enregistrer_visite_compte_comparaisons_et_changements(etat_path):
+    url = "https://abg.fr"
+
+    premiere = enregistrer_visite(etat_path, url, ["o1", "o2"], DEBUT)
+    assert premiere["a_change"] is True
+    assert (premiere["nb_comparaisons"], premiere["nb_changements"]) == (0, 0)
+
+    # Même contenu, dans un autre ordre
+    identique = enregistrer_visite(etat_path, url, ["o2", "o1"], DEBUT + timedelta(days=1))
+    assert identique["a_change"] is False
+    assert (identique["nb_comparaisons"], identique["nb_changements"]) == (1, 0)
+    assert identique["dernier_changement"] == DEBUT.isoformat(timespec="seconds")
+
+    modifiee = enregistrer_visite(etat_path, url, ["o1", "o3"], DEBUT + timedelta(days=2))
+    assert modifiee["a_change"] is True
+    assert (modifiee["nb_comparaisons"], modifiee["nb_changements"]) == (2, 1)
+
+    etat = charger_etat(etat_path)[url]
+    assert etat["premiere_visite"] == DEBUT.isoformat(timespec="seconds")
+    assert etat["derniere_visite"] == etat["dernier_changement"] == (DEBUT + timedelta(days=2)).isoformat(
+        timespec="seconds"
+    )